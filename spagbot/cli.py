@@ -91,7 +91,7 @@ from .config import (
     TOURNAMENT_ID, AUTH_HEADERS, API_BASE_URL,
     ist_iso, ist_stamp, SUBMIT_PREDICTION, METACULUS_HTTP_TIMEOUT,
 )
-from .net.metaculus_client import list_posts_from_tournament_resilient
+from .net.metaculus_client import aclose_client, list_posts_from_tournament_resilient
 from .prompts import build_binary_prompt, build_numeric_prompt, build_mcq_prompt
 from .providers import DEFAULT_ENSEMBLE, _get_or_client, llm_semaphore
 from .ensemble import EnsembleResult, MemberOutput, run_ensemble_binary, run_ensemble_mcq, run_ensemble_numeric
@@ -1291,6 +1291,14 @@ async def run_one_question(
 # ==============================================================================
 
 async def run_job(mode: str, limit: int, submit: bool, purpose: str) -> None:
+    """Run the job, then close the pooled Metaculus client inside this loop."""
+    try:
+        await _run_job(mode=mode, limit=limit, submit=submit, purpose=purpose)
+    finally:
+        await aclose_client()
+
+
+async def _run_job(mode: str, limit: int, submit: bool, purpose: str) -> None:
     """
     Fetch a batch of posts and process them one by one.
     Supports:
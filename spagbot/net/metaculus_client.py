@@ -2,12 +2,33 @@
 from __future__ import annotations
 
 import asyncio
+import importlib.util
+import json
 import os
-from typing import Any, Dict, Iterable, Mapping, MutableMapping, Optional
+import random
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional
 
 import httpx
 
-from spagbot.util.diagnostics import write_jsonl
+try:  # optional: orjson decodes bytes directly and is several times faster
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    _json_loads = json.loads
+
+try:  # optional: incremental parsing of very large pages
+    import ijson
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
+from spagbot.util.diagnostics import write_jsonl_nowait
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes")
+
 
 # Environment knobs ------------------------------------------------------------
 _DEFAULT_API_BASE = "https://www.metaculus.com/api"
@@ -18,18 +39,54 @@ _MAX_RETRIES = int(os.getenv("METACULUS_MAX_RETRIES", "3"))
 _DIAG_DIR = os.getenv("LOGS_BASE_DIR", "forecast_logs")
 _DIAG_PATH = os.path.join(_DIAG_DIR, "diagnostics", "metaculus_http.jsonl")
 
+# Importing forecasting-tools is slow; opt in to pay it at startup rather than
+# on the first Cloudflare failure, when the fallback is actually needed.
+_PRELOAD_FALLBACK = _env_flag("SPAGBOT_PRELOAD_FALLBACK", "0")
+
+_POSTS_URL = f"{_API_BASE}/posts/"
+# Query params shared by every page; limit/offset/tournaments are added per call.
+_POSTS_PARAMS: Mapping[str, str] = MappingProxyType({
+    "order_by": "-hotness",
+    "forecast_type": "binary,multiple_choice,numeric,discrete",
+    "statuses": "open",
+    "include_description": "true",
+})
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 8.0
+# Client errors worth retrying; any other non-Cloudflare 4xx fails immediately.
+_RETRYABLE_4XX = frozenset({408, 425, 429})
+_sleep = asyncio.sleep  # indirection so tests can skip real backoff
+_MAX_CONNECTIONS = int(os.getenv("METACULUS_MAX_CONNECTIONS", "20"))
+_MAX_KEEPALIVE = int(os.getenv("METACULUS_MAX_KEEPALIVE", "10"))
+_KEEPALIVE_EXPIRY = float(os.getenv("METACULUS_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 multiplexes concurrent page fetches over one TLS session; httpx needs
+# the optional ``h2`` package for it (``pip install httpx[http2]``).
+_HTTP2 = _env_flag("METACULUS_HTTP2", "1") and importlib.util.find_spec("h2") is not None
+_PAGE_CONCURRENCY = int(os.getenv("METACULUS_PAGE_CONCURRENCY", "4"))
+
+# Opt-in: with METACULUS_STREAM_LARGE_PAGES=1 (and ijson installed), pages whose
+# Content-Length reaches the threshold are parsed incrementally. This only saves
+# the raw body buffer and costs several times the CPU of the buffered orjson
+# path; yajl2_c with use_float=True also rejects integers beyond int64.
+_STREAM_LARGE_PAGES = _env_flag("METACULUS_STREAM_LARGE_PAGES", "0") and ijson is not None
+_STREAM_THRESHOLD = int(os.getenv("METACULUS_STREAM_THRESHOLD", str(512 * 1024)))
+
 _CF_MARKERS: Iterable[str] = ("Just a moment", "__cf_chl", "challenge-platform")
+_CF_MARKERS_BYTES = tuple(marker.encode() for marker in _CF_MARKERS)
+_CF_SCAN_BYTES = 4096
 
-_TYPE_ALIASES: Dict[str, str] = {
+_TYPE_ALIASES: Mapping[str, str] = MappingProxyType({
     "binary": "binary",
     "multiple_choice": "multiple_choice",
     "mcq": "multiple_choice",
     "numeric": "numeric",
     "discrete": "discrete",
-}
+})
+_CANONICAL_TYPES = frozenset(_TYPE_ALIASES.values())
 
 
-def _headers() -> Dict[str, str]:
+def _build_headers() -> Dict[str, str]:
     headers = {
         "User-Agent": os.getenv(
             "SPAGBOT_UA",
@@ -47,15 +104,75 @@ def _headers() -> Dict[str, str]:
     return headers
 
 
-def _looks_like_cloudflare(content_type: str, body: str) -> bool:
-    if "text/html" in (content_type or "").lower():
+# Env vars are read once at import (as for _TOKEN above), so build headers once too.
+_HEADERS: Mapping[str, str] = MappingProxyType(_build_headers())
+
+
+_FALLBACK_API: Any = None
+if _PRELOAD_FALLBACK:
+    try:
+        from forecasting_tools import MetaculusApi as _FALLBACK_API  # type: ignore
+    except Exception:  # pragma: no cover - optional at import time
+        _FALLBACK_API = None
+
+
+# Shared client ---------------------------------------------------------------
+# One pooled client per event loop so paginated calls reuse keep-alive
+# connections instead of paying a TCP+TLS handshake per page. Creation is
+# synchronous, so no lock is needed to keep it single-instance within a loop.
+_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    global _CLIENT, _CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _CLIENT is None or _CLIENT_LOOP is not loop:
+        # A client from a previous loop cannot be reused; swap in a new one
+        # before closing the old so concurrent callers never see it.
+        stale = _CLIENT
+        _CLIENT = httpx.AsyncClient(
+            timeout=_TIMEOUT,
+            follow_redirects=False,
+            headers=_HEADERS,
+            http2=_HTTP2,
+            limits=httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_KEEPALIVE,
+                keepalive_expiry=_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _CLIENT_LOOP = loop
+        if stale is not None:
+            try:
+                await stale.aclose()
+            except Exception:
+                # Its transports belong to the old loop, which may be closed.
+                pass
+    return _CLIENT
+
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client (safe to call when none is open)."""
+    global _CLIENT, _CLIENT_LOOP
+    client, _CLIENT, _CLIENT_LOOP = _CLIENT, None, None
+    if client is not None:
+        await client.aclose()
+
+
+def _looks_like_cloudflare(ctype_lower: str, raw: bytes) -> bool:
+    """``ctype_lower`` is the already lower-cased content type; ``raw`` the body head."""
+    if "text/html" in ctype_lower:
         return True
-    return any(marker in body for marker in _CF_MARKERS)
+    return any(marker in raw for marker in _CF_MARKERS_BYTES)
 
 
 def _coerce_type(value: Optional[str]) -> Optional[str]:
     if not value:
         return None
+    if isinstance(value, str) and value in _CANONICAL_TYPES:
+        # Common case: the API already sends canonical names; skip strip/lower.
+        return value
     key = str(value).strip().lower()
     if not key:
         return None
@@ -91,11 +208,19 @@ def _normalise_question_block(
 
 
 def _normalise_post_dict(post: Mapping[str, Any]) -> Dict[str, Any]:
-    post_map: MutableMapping[str, Any] = dict(post)
+    """Canonicalise a posts-API entry.
+
+    Plain ``dict`` inputs (and their nested ``question`` dict) are normalised in
+    place, since callers pass freshly decoded JSON they own; other mappings are
+    copied first.
+    """
+    post_map: Dict[str, Any] = post if type(post) is dict else dict(post)
 
     question_data = post_map.get("question")
     if isinstance(question_data, Mapping):
-        question_map: MutableMapping[str, Any] = dict(question_data)
+        question_map: MutableMapping[str, Any] = (
+            question_data if type(question_data) is dict else dict(question_data)
+        )
     else:
         question_map = {}
 
@@ -104,7 +229,9 @@ def _normalise_post_dict(post: Mapping[str, Any]) -> Dict[str, Any]:
         or question_map.get("title")
         or question_map.get("question_text")
         or post_map.get("name")
-        or post_map.get("question")
+        # Only a bare string ``question`` doubles as a title; a dict here is the
+        # block being normalised in place and would end up containing itself.
+        or (question_data if isinstance(question_data, str) else None)
     )
     fallback_type = (
         post_map.get("type")
@@ -139,28 +266,48 @@ def _normalise_post_dict(post: Mapping[str, Any]) -> Dict[str, Any]:
         post_map.setdefault("title", fallback_title)
 
     post_map["question"] = question_map
-    return dict(post_map)
+    return post_map
+
+
+_WRAPPER_DUMPERS = ("to_dict", "model_dump", "dict", "__dict__")
+# Wrapper class -> dumper that worked for it, so later questions skip the probing.
+_WRAPPER_DUMPER_CACHE: Dict[type, str] = {}
+
+
+def _dump_with(question: Any, attr: str) -> Dict[str, Any]:
+    if attr == "__dict__":
+        maybe = getattr(question, "__dict__", None)
+    else:
+        getter = getattr(question, attr, None)
+        if not callable(getter):
+            return {}
+        try:
+            maybe = getter()
+        except Exception:  # pragma: no cover - defensive
+            return {}
+    return dict(maybe) if isinstance(maybe, Mapping) else {}
+
+
+def _wrapper_to_dict(question: Any) -> Dict[str, Any]:
+    cls = type(question)
+    cached = _WRAPPER_DUMPER_CACHE.get(cls)
+    if cached is not None:
+        q_map = _dump_with(question, cached)
+        if q_map:
+            return q_map
+    for attr in _WRAPPER_DUMPERS:
+        q_map = _dump_with(question, attr)
+        if q_map:
+            _WRAPPER_DUMPER_CACHE[cls] = attr
+            return q_map
+    return {}
 
 
 def _normalise_wrapper_question(question: Any) -> Dict[str, Any]:
     if isinstance(question, Mapping):
         q_map: MutableMapping[str, Any] = dict(question)
     else:
-        q_map = {}
-        for attr in ("to_dict", "model_dump", "dict"):
-            getter = getattr(question, attr, None)
-            if callable(getter):
-                try:
-                    maybe = getter()
-                except Exception:  # pragma: no cover - defensive
-                    continue
-                if isinstance(maybe, Mapping):
-                    q_map = dict(maybe)
-                    break
-        if not q_map:
-            maybe_dict = getattr(question, "__dict__", None)
-            if isinstance(maybe_dict, Mapping):
-                q_map = dict(maybe_dict)
+        q_map = _wrapper_to_dict(question)
 
     post_id = q_map.get("post_id") or q_map.get("id") or getattr(question, "post_id", None)
     if post_id is None:
@@ -179,6 +326,8 @@ def _normalise_wrapper_question(question: Any) -> Dict[str, Any]:
         or getattr(question, "question_type", None)
         or getattr(question, "type", None)
     )
+    # Coerce once here; base_post below is then already in canonical shape.
+    qtype = _coerce_type(raw_type) or raw_type
     close_time = q_map.get("close_time") or getattr(question, "close_time", None)
     if hasattr(close_time, "isoformat"):
         try:
@@ -191,15 +340,16 @@ def _normalise_wrapper_question(question: Any) -> Dict[str, Any]:
         "post_id": post_id,
         "title": title,
         "url": url,
-        "type": raw_type,
+        "type": qtype,
+        "question_type": qtype,
         "close_time": close_time,
         "question": {
             "id": post_id,
             "title": title,
             "question_text": title,
             "url": url,
-            "question_type": raw_type,
-            "type": raw_type,
+            "question_type": qtype,
+            "type": qtype,
             "close_time": close_time,
         },
     }
@@ -207,62 +357,250 @@ def _normalise_wrapper_question(question: Any) -> Dict[str, Any]:
     # Preserve any extra fields from the wrapper mapping.
     base_post.update({k: v for k, v in q_map.items() if k not in base_post})
 
-    return _normalise_post_dict(base_post)
+    return base_post
+
+
+def _should_stream(response: httpx.Response) -> bool:
+    if response.status_code != 200:
+        return False
+    if not response.headers.get("content-type", "").lower().startswith("application/json"):
+        return False
+    try:
+        return int(response.headers.get("content-length", "")) >= _STREAM_THRESHOLD
+    except ValueError:
+        return False
+
+
+class _AsyncByteReader:
+    """Async file-like view of ``response.aiter_bytes()`` for ijson."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        self._chunks = response.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""  # ijson probes with read(0) to tell bytes from str
+        async for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
+
+async def _stream_posts(response: httpx.Response) -> Dict[str, Any]:
+    """Parse a posts page incrementally, normalising each post as it completes.
+
+    Mirrors the buffered path: top-level keys are kept as-is, ``results`` and
+    ``posts`` lists are normalised, and a bare top-level list becomes ``results``.
+    """
+    events = ijson.parse_async(_AsyncByteReader(response), use_float=True)
+    top = ijson.ObjectBuilder()
+    item_prefixes: Dict[str, str] = {}
+    posts: Dict[str, List[Dict[str, Any]]] = {}
+    item = None
+    item_prefix = ""
+    async for prefix, event, value in events:
+        if item is not None:
+            item.event(event, value)
+            if prefix == item_prefix and event == "end_map":
+                posts[item_prefixes[prefix]].append(_normalise_post_dict(item.value))
+                item = None
+            continue
+        if not prefix and event in ("start_map", "start_array"):
+            is_list = event == "start_array"
+            item_prefixes = {"item": "results"} if is_list else {"results.item": "results", "posts.item": "posts"}
+        elif event == "start_map" and prefix in item_prefixes:
+            item = ijson.ObjectBuilder()
+            item.event(event, value)
+            item_prefix = prefix
+            posts.setdefault(item_prefixes[prefix], [])
+            continue
+        top.event(event, value)
+
+    payload = top.value
+    if isinstance(payload, list):
+        return {"results": posts.get("results", [])}
+    if not isinstance(payload, dict):
+        return {"results": []}
+    payload.update(posts)
+    return payload
 
 
 async def _http_list_posts(tournament_id: str | int, *, limit: int, offset: int) -> Mapping[str, Any]:
-    params = {
-        "limit": limit,
-        "offset": offset,
-        "order_by": "-hotness",
-        "forecast_type": "binary,multiple_choice,numeric,discrete",
-        "tournaments": tournament_id,
-        "statuses": "open",
-        "include_description": "true",
-    }
-    url = f"{_API_BASE}/posts/"
+    params = {**_POSTS_PARAMS, "limit": limit, "offset": offset, "tournaments": tournament_id}
 
-    async with httpx.AsyncClient(timeout=_TIMEOUT, follow_redirects=False, headers=_headers()) as client:
-        last_exc: Exception | None = None
-        for attempt in range(1, _MAX_RETRIES + 1):
-            try:
-                response = await client.get(url, params=params)
-                content_type = response.headers.get("content-type", "")
-                if response.status_code == 200 and content_type.lower().startswith("application/json"):
-                    data = response.json()
-                    if isinstance(data, Mapping):
-                        payload = dict(data)
-                        for key in ("results", "posts"):
-                            if isinstance(payload.get(key), list):
-                                payload[key] = [_normalise_post_dict(p) for p in payload[key]]
-                        return payload
-                    if isinstance(data, list):
-                        return {"results": [_normalise_post_dict(p) for p in data]}
-                    return {"results": []}
-
-                body_snippet = (response.text or "")[:300]
-                is_cf = _looks_like_cloudflare(content_type, body_snippet)
-                write_jsonl(
-                    _DIAG_PATH,
-                    {
-                        "phase": "metaculus_http",
-                        "status": response.status_code,
-                        "ctype": content_type,
-                        "is_cf": bool(is_cf),
-                        "body_snippet": body_snippet,
-                    },
-                )
-                if not is_cf and response.status_code < 500:
-                    response.raise_for_status()
-            except Exception as exc:  # noqa: BLE001 - we intentionally capture all for retry
-                last_exc = exc
-            await asyncio.sleep(min(2 ** attempt, 8))
+    client = await _get_client()
+    last_exc: Exception | None = None
+    delay = _BACKOFF_BASE
+    for attempt in range(1, _MAX_RETRIES + 1):
+        try:
+            if _STREAM_LARGE_PAGES:
+                async with client.stream("GET", _POSTS_URL, params=params) as response:
+                    if _should_stream(response):
+                        return await _stream_posts(response)
+                    await response.aread()
+            else:
+                response = await client.get(_POSTS_URL, params=params)
+            content_type = response.headers.get("content-type", "")
+            ctype_lower = (content_type or "").lower()
+            if response.status_code == 200 and ctype_lower.startswith("application/json"):
+                data = _json_loads(response.content)
+                if isinstance(data, dict):
+                    for key in ("results", "posts"):
+                        if isinstance(data.get(key), list):
+                            data[key] = [_normalise_post_dict(p) for p in data[key]]
+                    return data
+                if isinstance(data, list):
+                    return {"results": [_normalise_post_dict(p) for p in data]}
+                return {"results": []}
+
+            # Scan raw bytes; only the short diagnostic snippet is decoded.
+            raw = (response.content or b"")[:_CF_SCAN_BYTES]
+            is_cf = _looks_like_cloudflare(ctype_lower, raw)
+            body_snippet = raw[:300].decode("utf-8", "replace")
+            write_jsonl_nowait(
+                _DIAG_PATH,
+                {
+                    "phase": "metaculus_http",
+                    "status": response.status_code,
+                    "ctype": content_type,
+                    "is_cf": bool(is_cf),
+                    "body_snippet": body_snippet,
+                },
+            )
+            if not is_cf and response.status_code < 500:
+                response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            last_exc = exc
+            if exc.response.status_code not in _RETRYABLE_4XX:
+                break
+        except Exception as exc:  # noqa: BLE001 - we intentionally capture all for retry
+            last_exc = exc
+        if attempt < _MAX_RETRIES:
+            # Decorrelated jitter keeps concurrent page fetches from retrying in lockstep.
+            delay = min(_BACKOFF_CAP, random.uniform(_BACKOFF_BASE, delay * 3))
+            await _sleep(delay)
 
     if last_exc is not None:
         raise last_exc
     raise RuntimeError("Metaculus posts fetch failed without explicit exception.")
 
 
+def _page_posts(page: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    for key in ("results", "posts"):
+        posts = page.get(key)
+        if isinstance(posts, list):
+            return posts
+    return []
+
+
+def _first_error(pages: List[Any]) -> Optional[Exception]:
+    for page in pages:
+        if isinstance(page, BaseException):
+            if not isinstance(page, Exception):
+                raise page  # cancellation must propagate, not trigger the fallback
+            return page
+    return None
+
+
+async def list_all_posts_from_tournament(
+    tournament_id: str | int,
+    *,
+    page_size: int = 100,
+    max_concurrency: int = _PAGE_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Fetch every open post of a tournament, requesting pages concurrently.
+
+    The first page is fetched alone; if it reports ``count``/``total`` the
+    remaining offsets are requested at once, stepping by the number of posts
+    that page actually held (the server may cap ``limit``). Otherwise pages are
+    requested in speculative batches of ``max_concurrency`` until a short page
+    is seen; without a count a short first page is indistinguishable from a
+    capped one, so this branch assumes the server honours ``page_size``.
+    Concurrency is bounded by a semaphore to stay clear of Cloudflare limits.
+    If any page fails, falls back to forecasting-tools like
+    :func:`list_posts_from_tournament_resilient`.
+    """
+    page_size = max(1, int(page_size))
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _fetch(offset: int) -> Mapping[str, Any]:
+        async with sem:
+            return await _http_list_posts(tournament_id, limit=page_size, offset=offset)
+
+    try:
+        first = await _http_list_posts(tournament_id, limit=page_size, offset=0)
+    except Exception as primary_error:
+        return _fallback_list_posts(tournament_id, primary_error)
+    posts: List[Dict[str, Any]] = list(_page_posts(first))
+    total = first.get("count", first.get("total"))
+
+    if isinstance(total, int):
+        step = len(posts)
+        offsets = range(step, total, step) if step else ()
+        pages = await asyncio.gather(*(_fetch(o) for o in offsets), return_exceptions=True)
+        error = _first_error(pages)
+        if error is not None:
+            return _fallback_list_posts(tournament_id, error)
+        for page in pages:
+            posts.extend(_page_posts(page))
+    else:
+        offset = page_size
+        last_len = len(posts)
+        while last_len >= page_size:
+            batch = [offset + i * page_size for i in range(max(1, max_concurrency))]
+            pages = await asyncio.gather(*(_fetch(o) for o in batch), return_exceptions=True)
+            offset = batch[-1] + page_size
+            # Walk in offset order: a failure past the short page only hit a
+            # speculative request beyond the data and must not discard it.
+            for page in pages:
+                error = _first_error([page])
+                if error is not None:
+                    return _fallback_list_posts(tournament_id, error)
+                page_posts = _page_posts(page)
+                posts.extend(page_posts)
+                last_len = len(page_posts)
+                if last_len < page_size:
+                    break
+
+    return {"results": posts, "posts": posts}
+
+
+def _fallback_list_posts(tournament_id: str | int, primary_error: BaseException) -> Dict[str, Any]:
+    """Fetch open questions via forecasting-tools; re-raise ``primary_error`` if that fails too."""
+    write_jsonl_nowait(
+        _DIAG_PATH,
+        {
+            "phase": "metaculus_http_error",
+            "error": type(primary_error).__name__,
+            "message": str(primary_error)[:200],
+        },
+    )
+    try:
+        api = _FALLBACK_API
+        if api is None:
+            from forecasting_tools import MetaculusApi as api  # type: ignore
+
+        questions = api.get_all_open_questions_from_tournament(
+            tournament_id=tournament_id
+        )
+        normalised = [_normalise_wrapper_question(q) for q in questions]
+        write_jsonl_nowait(
+            _DIAG_PATH,
+            {"phase": "metaculus_fallback", "count": len(normalised)},
+        )
+        return {"results": normalised, "posts": normalised}
+    except Exception as fallback_error:  # pragma: no cover - rare path
+        write_jsonl_nowait(
+            _DIAG_PATH,
+            {
+                "phase": "metaculus_fallback_error",
+                "error": type(fallback_error).__name__,
+                "message": str(fallback_error)[:200],
+            },
+        )
+        raise primary_error
+
+
 async def list_posts_from_tournament_resilient(
     tournament_id: str | int,
     *,
@@ -273,33 +611,4 @@ async def list_posts_from_tournament_resilient(
     try:
         return await _http_list_posts(tournament_id, limit=limit, offset=offset)
     except Exception as primary_error:
-        write_jsonl(
-            _DIAG_PATH,
-            {
-                "phase": "metaculus_http_error",
-                "error": type(primary_error).__name__,
-                "message": str(primary_error)[:200],
-            },
-        )
-        try:
-            from forecasting_tools import MetaculusApi  # type: ignore
-
-            questions = MetaculusApi.get_all_open_questions_from_tournament(
-                tournament_id=tournament_id
-            )
-            normalised = [_normalise_wrapper_question(q) for q in questions]
-            write_jsonl(
-                _DIAG_PATH,
-                {"phase": "metaculus_fallback", "count": len(normalised)},
-            )
-            return {"results": normalised, "posts": normalised}
-        except Exception as fallback_error:  # pragma: no cover - rare path
-            write_jsonl(
-                _DIAG_PATH,
-                {
-                    "phase": "metaculus_fallback_error",
-                    "error": type(fallback_error).__name__,
-                    "message": str(fallback_error)[:200],
-                },
-            )
-            raise primary_error
+        return _fallback_list_posts(tournament_id, primary_error)
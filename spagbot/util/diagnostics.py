@@ -1,22 +1,138 @@
 """Lightweight diagnostics helpers."""
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
 import os
+import threading
 import time
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:  # optional: orjson serializes straight to UTF-8 bytes, much faster than json
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+
+    def _dump_line(payload: Mapping[str, Any]) -> bytes:
+        return orjson.dumps(payload, option=_ORJSON_OPTIONS)
+
+except ImportError:  # pragma: no cover - depends on the environment
+
+    def _dump_line(payload: Mapping[str, Any]) -> bytes:
+        return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+# One O_APPEND descriptor per file, kept open for the life of the process:
+# each batch is a single os.write with no open/close or Python-level buffering.
+# Batches arrive from the event loop and from worker threads, hence the lock.
+_FDS: Dict[str, int] = {}
+_FDS_LOCK = threading.Lock()
+_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+
+
+def _fd(path: str | os.PathLike[str]) -> int:
+    key = os.path.abspath(os.fspath(path))
+    fd = _FDS.get(key)
+    if fd is None:
+        Path(key).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(key, _OPEN_FLAGS, 0o644)
+        _FDS[key] = fd
+    return fd
+
+
+def close_handles() -> None:
+    """Close every cached diagnostics file descriptor."""
+    with _FDS_LOCK:
+        for fd in _FDS.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        _FDS.clear()
+
+
+atexit.register(close_handles)
 
 
 def write_jsonl(path: str | os.PathLike[str], record: Mapping[str, Any]) -> None:
     """Append a JSON object with a timestamp to ``path`` as JSONL."""
+    write_jsonl_many(path, (record,))
+
+
+def write_jsonl_many(path: str | os.PathLike[str], records: Iterable[Mapping[str, Any]]) -> None:
+    """Append several JSON objects to ``path`` with a single write.
+
+    A record that cannot be serialized is skipped; the rest are still written.
+    """
     try:
-        p = Path(path)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        payload = dict(record)
-        payload.setdefault("_ts", int(time.time()))
-        with p.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        now = int(time.time())
+        lines = []
+        for record in records:
+            try:
+                payload = dict(record)
+                payload.setdefault("_ts", now)
+                lines.append(_dump_line(payload))
+            except Exception:
+                continue  # drop only the unserializable record
+        if not lines:
+            return
+        data = memoryview(b"".join(lines))
+        with _FDS_LOCK:
+            fd = _fd(path)
+            while data:
+                data = data[os.write(fd, data):]
     except Exception:
         # Diagnostics should never block the main flow; swallow errors.
         pass
+
+
+# Background writer ------------------------------------------------------------
+# Async callers enqueue records; one task per event loop drains the queue in
+# batches and appends them from a worker thread, so disk latency never stalls
+# the loop. Anything still queued when the loop shuts down is flushed.
+_BATCH_SIZE = 64
+_QUEUE: Optional[asyncio.Queue] = None
+_WRITER: Optional[asyncio.Task] = None
+
+
+def write_jsonl_nowait(path: str | os.PathLike[str], record: Mapping[str, Any]) -> None:
+    """Queue ``record`` for appending to ``path`` without blocking the event loop.
+
+    Falls back to a synchronous :func:`write_jsonl` when no loop is running.
+    """
+    global _QUEUE, _WRITER
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        write_jsonl(path, record)
+        return
+    if _QUEUE is None or _WRITER is None or _WRITER.done() or _WRITER.get_loop() is not loop:
+        _QUEUE = asyncio.Queue()
+        _WRITER = loop.create_task(_writer_loop(_QUEUE))
+    payload = dict(record)
+    payload.setdefault("_ts", int(time.time()))
+    _QUEUE.put_nowait((path, payload))
+
+
+def _write_batch(batch: List[Tuple[Any, Dict[str, Any]]]) -> None:
+    by_path: Dict[Any, List[Dict[str, Any]]] = {}
+    for path, payload in batch:
+        by_path.setdefault(path, []).append(payload)
+    for path, records in by_path.items():
+        write_jsonl_many(path, records)
+
+
+async def _writer_loop(queue: asyncio.Queue) -> None:
+    try:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            await asyncio.to_thread(_write_batch, batch)
+    finally:
+        leftover = []
+        while not queue.empty():
+            leftover.append(queue.get_nowait())
+        _write_batch(leftover)
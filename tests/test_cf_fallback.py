@@ -1,10 +1,13 @@
 from __future__ import annotations
 import asyncio
+import contextlib
 import importlib
+import json
 import sys
 import types
 from pathlib import Path
 
+import httpx
 import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -18,42 +21,113 @@ class FakeResponse:
     def __init__(self, *, status_code: int, text: str, headers: dict[str, str]):
         self.status_code = status_code
         self.text = text
+        self.content = text.encode("utf-8")
         self.headers = headers
 
     def json(self) -> dict:
         return {}
 
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                f"HTTP {self.status_code}", request=None, response=self  # type: ignore[arg-type]
+            )
+
+    async def aread(self) -> bytes:
+        return self.content
+
+    async def aiter_bytes(self):
+        # Small chunks so streamed parsing sees values split across reads.
+        for start in range(0, len(self.content), 7):
+            yield self.content[start:start + 7]
+
+
+class FakeClient:
+    """httpx.AsyncClient stand-in; subclasses implement ``get``."""
+
+    def __init__(self, *_, **__):  # noqa: ANN002, ANN003
+        pass
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method, url, params=None, **kwargs):  # noqa: ANN001, ANN003
+        yield await self.get(url, params=params, **kwargs)
+
+
+@pytest.fixture
+def serve(monkeypatch, tmp_path):
+    """Reload the client module with ``httpx.AsyncClient`` serving ``response``.
+
+    ``response`` is a ``FakeResponse`` or a ``(url, params) -> FakeResponse``
+    factory; set any env knobs before calling so the reload picks them up.
+    """
+
+    def _serve(response):  # noqa: ANN001, ANN202
+        factory = response if callable(response) else (lambda url, params: response)
+
+        class DummyClient(FakeClient):
+            async def get(self, url, params=None, **kwargs):  # noqa: ANN001, ANN003
+                return factory(url, params)
+
+        monkeypatch.setenv("LOGS_BASE_DIR", str(tmp_path))
+        mc = importlib.reload(mc_module)
+        monkeypatch.setattr(mc.httpx, "AsyncClient", DummyClient)
+        return mc
+
+    return _serve
+
+
+class FallbackApi:
+    @staticmethod
+    def get_all_open_questions_from_tournament(tournament_id: str):  # noqa: ANN001
+        return [{"id": 7, "question_text": "Fallback?", "question_type": "binary"}]
+
+
+@pytest.fixture
+def paginate(monkeypatch, tmp_path):
+    """Reload the client module with a fake ``_http_list_posts`` and fallback stub.
+
+    ``page(offset, limit)`` builds each page. The returned namespace records
+    requested ``offsets``; offsets added to ``failing`` raise instead, and the
+    forecasting-tools fallback then yields a single post with id 7.
+    """
+
+    def _paginate(page):  # noqa: ANN001, ANN202
+        monkeypatch.setenv("LOGS_BASE_DIR", str(tmp_path))
+        mc = importlib.reload(mc_module)
+        state = types.SimpleNamespace(mc=mc, offsets=[], failing=[])
+
+        async def fake_list_posts(tournament_id, *, limit, offset):  # noqa: ANN001
+            state.offsets.append(offset)
+            if offset in state.failing:
+                raise RuntimeError("page failed")
+            return page(offset, limit)
+
+        monkeypatch.setattr(mc, "_http_list_posts", fake_list_posts)
+        monkeypatch.setitem(sys.modules, "forecasting_tools", types.SimpleNamespace(MetaculusApi=FallbackApi))
+        return state
+
+    return _paginate
+
 
 @pytest.mark.asyncio
-def test_cf_html_triggers_fallback(monkeypatch, tmp_path):
+def test_cf_html_triggers_fallback(monkeypatch, serve):
     monkeypatch.setenv("METACULUS_TOKEN", "token123")
-    monkeypatch.setenv("LOGS_BASE_DIR", str(tmp_path))
-    monkeypatch.setenv("METACULUS_MAX_RETRIES", "1")
+    monkeypatch.setenv("METACULUS_MAX_RETRIES", "3")
     monkeypatch.setenv("METACULUS_REQUEST_TIMEOUT", "1")
 
-    mc = importlib.reload(mc_module)
-
-    async def fake_get(self, url, params=None):  # noqa: ANN001
-        return FakeResponse(
+    mc = serve(
+        FakeResponse(
             status_code=403,
             text="<!doctype html><title>Just a moment...</title> __cf_chl",
             headers={"content-type": "text/html"},
         )
+    )
+    delays: list[float] = []
 
-    class DummyClient:
-        def __init__(self, *_, **__):  # noqa: D401, ANN002, ANN003
-            """HTTP client stub."""
-
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, *exc_info):  # noqa: ANN002
-            return False
-
-        async def get(self, url, params=None):  # noqa: ANN001
-            return await fake_get(self, url, params=params)
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
 
-    monkeypatch.setattr(mc.httpx, "AsyncClient", DummyClient)
+    monkeypatch.setattr(mc, "_sleep", fake_sleep)
 
     class StubQuestion:
         def __init__(self):
@@ -83,3 +157,134 @@ def test_cf_html_triggers_fallback(monkeypatch, tmp_path):
     assert results[0]["title"] == "Q?"
     assert results[0]["question"]["type"] == "binary"
     assert results[0]["question"]["title"] == "Q?"
+    assert results[0]["question_type"] == "binary"
+    assert results[0]["question"]["question_type"] == "binary"
+    assert results[0]["question"]["question_text"] == "Q?"
+    assert results[0]["question"]["id"] == 123
+    assert len(delays) == 2
+    assert all(mc._BACKOFF_BASE <= d <= mc._BACKOFF_CAP for d in delays)
+
+
+def test_permanent_4xx_is_not_retried(monkeypatch, serve):
+    monkeypatch.setenv("METACULUS_MAX_RETRIES", "3")
+    calls: list[str] = []
+
+    def respond(url, params):  # noqa: ANN001, ANN202
+        calls.append(url)
+        return FakeResponse(
+            status_code=404,
+            text='{"detail": "Not found."}',
+            headers={"content-type": "application/json"},
+        )
+
+    mc = serve(respond)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(mc._http_list_posts("demo", limit=10, offset=0))
+    assert len(calls) == 1
+
+
+def test_list_all_posts_merges_pages_and_falls_back(paginate):
+    fake = paginate(
+        lambda offset, limit: {
+            "count": 25,
+            "results": [{"id": i} for i in range(offset, min(offset + limit, 25))],
+        }
+    )
+
+    data = asyncio.run(fake.mc.list_all_posts_from_tournament("demo", page_size=10))
+    assert [p["id"] for p in data["results"]] == list(range(25))
+
+    fake.failing.append(20)
+
+    data = asyncio.run(fake.mc.list_all_posts_from_tournament("demo", page_size=10))
+    assert [p["id"] for p in data["results"]] == [7]
+
+
+def test_list_all_posts_without_count_stops_at_short_page(paginate):
+    # Pages past the end carry a sentinel so merging beyond the short page shows.
+    fake = paginate(
+        lambda offset, limit: {
+            "results": [{"id": i} for i in range(offset, min(offset + limit, 25))] or [{"id": 999}]
+        }
+    )
+
+    data = asyncio.run(fake.mc.list_all_posts_from_tournament("demo", page_size=10, max_concurrency=4))
+    assert [p["id"] for p in data["results"]] == list(range(25))
+    assert sorted(fake.offsets) == [0, 10, 20, 30, 40]
+
+    # A failure on a speculative page past the short one keeps the complete result.
+    fake.failing.append(30)
+
+    data = asyncio.run(fake.mc.list_all_posts_from_tournament("demo", page_size=10, max_concurrency=4))
+    assert [p["id"] for p in data["results"]] == list(range(25))
+
+    fake.failing.append(20)
+
+    data = asyncio.run(fake.mc.list_all_posts_from_tournament("demo", page_size=10, max_concurrency=4))
+    assert [p["id"] for p in data["results"]] == [7]
+
+
+def test_list_all_posts_steps_by_capped_page_length(paginate):
+    # The server caps limit at 4 whatever page_size asks for.
+    fake = paginate(
+        lambda offset, limit: {
+            "count": 25,
+            "results": [{"id": i} for i in range(offset, min(offset + min(limit, 4), 25))],
+        }
+    )
+
+    data = asyncio.run(fake.mc.list_all_posts_from_tournament("demo", page_size=10))
+    assert [p["id"] for p in data["results"]] == list(range(25))
+
+
+def test_json_page_is_normalised(serve):
+    mc = serve(
+        FakeResponse(
+            status_code=200,
+            text='{"next": null, "results": [{"id": 9, "title": "Which?", "question": {"type": "MCQ"}}]}',
+            headers={"content-type": "application/json"},
+        )
+    )
+
+    data = asyncio.run(mc._http_list_posts("demo", limit=10, offset=0))
+    post = data["results"][0]
+    assert data["next"] is None
+    assert post["type"] == "multiple_choice"
+    assert post["question"]["question_type"] == "multiple_choice"
+    assert post["question"]["title"] == "Which?"
+    assert post["question"]["id"] == 9
+
+
+def test_untitled_post_does_not_reference_itself():
+    post = mc_module._normalise_post_dict({"id": 1, "question": {"type": "binary", "id": 5}})
+    assert post["question"].get("title") is not post["question"]
+    json.dumps(post)
+    assert mc_module._normalise_post_dict({"id": 2, "question": "Bare?"})["title"] == "Bare?"
+
+
+def test_large_json_page_is_streamed(monkeypatch, serve):
+    pytest.importorskip("ijson")
+    monkeypatch.setenv("METACULUS_STREAM_LARGE_PAGES", "1")
+    monkeypatch.setenv("METACULUS_STREAM_THRESHOLD", "1")
+
+    body = (
+        '{"next": "https://example.com/p2", "score": 0.25, "results": ['
+        '{"id": 1, "title": "One?", "question": {"type": "binary", "options": [{"a": 1}]}},'
+        '{"id": 2, "title": "Two?", "type": "mcq"}]}'
+    )
+    mc = serve(
+        FakeResponse(
+            status_code=200,
+            text=body,
+            headers={"content-type": "application/json", "content-length": str(len(body))},
+        )
+    )
+
+    data = asyncio.run(mc._http_list_posts("demo", limit=10, offset=0))
+    assert data["next"] == "https://example.com/p2"
+    assert data["score"] == 0.25 and isinstance(data["score"], float)
+    assert [p["id"] for p in data["results"]] == [1, 2]
+    assert data["results"][0]["question"]["options"] == [{"a": 1}]
+    assert data["results"][1]["question"]["type"] == "multiple_choice"
+    assert data["results"][1]["question"]["title"] == "Two?"
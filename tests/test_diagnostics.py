@@ -0,0 +1,78 @@
+from __future__ import annotations
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spagbot.util import diagnostics
+
+
+@pytest.fixture(autouse=True)
+def _fresh_writer(monkeypatch):
+    monkeypatch.setattr(diagnostics, "_QUEUE", None)
+    monkeypatch.setattr(diagnostics, "_WRITER", None)
+    yield
+    diagnostics.close_handles()
+
+
+def _read(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_queued_records_are_flushed_when_the_loop_ends(tmp_path):
+    path = tmp_path / "nested" / "diag.jsonl"
+
+    async def enqueue(tag: str) -> None:
+        # Return without awaiting: the writer only gets to run during shutdown.
+        for i in range(150):
+            diagnostics.write_jsonl_nowait(path, {"run": tag, "i": i, "text": "çay ☕ İstanbul"})
+
+    asyncio.run(enqueue("first"))
+    rows = _read(path)
+    assert [r["i"] for r in rows] == list(range(150))
+    assert all(r["text"] == "çay ☕ İstanbul" and isinstance(r["_ts"], int) for r in rows)
+
+    # A second loop starts its own writer and appends to the same file.
+    asyncio.run(enqueue("second"))
+    # Outside any loop the record is written synchronously.
+    diagnostics.write_jsonl_nowait(path, {"run": "sync", 1: "non-str key"})
+
+    rows = _read(path)
+    assert [r["run"] for r in rows].count("second") == 150
+    assert rows[-1] == {"run": "sync", "1": "non-str key", "_ts": rows[-1]["_ts"]}
+    assert len(rows) == 301
+
+
+def test_write_jsonl_many_appends_to_existing_file(tmp_path):
+    path = tmp_path / "diag.jsonl"
+    path.write_text('{"pre": true}\n', encoding="utf-8")
+
+    diagnostics.write_jsonl(path, {"a": 1, "_ts": 5})
+    diagnostics.write_jsonl_many(path, ({"b": i} for i in range(3)))
+    diagnostics.write_jsonl_many(path, ())
+
+    rows = _read(path)
+    assert rows[0] == {"pre": True}
+    assert rows[1] == {"a": 1, "_ts": 5}
+    assert [r["b"] for r in rows[2:]] == [0, 1, 2]
+
+
+def test_unserializable_record_does_not_drop_its_batch(tmp_path):
+    path = tmp_path / "diag.jsonl"
+    other = tmp_path / "other.jsonl"
+
+    async def enqueue() -> None:
+        diagnostics.write_jsonl_nowait(path, {"ok": 1})
+        diagnostics.write_jsonl_nowait(path, {"bad": {1, 2}})
+        diagnostics.write_jsonl_nowait(other, {"ok": 3})
+        diagnostics.write_jsonl_nowait(path, {"ok": 2})
+
+    asyncio.run(enqueue())
+    assert [r["ok"] for r in _read(path)] == [1, 2]
+    assert [r["ok"] for r in _read(other)] == [3]